@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
+import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -8,41 +10,185 @@ import requests
 from io import BytesIO
 import streamlit as st
 
-@st.cache_data
-def load_national_data():
+CACHE_TTL = 60 * 60 * 24 * 7  # refresh the SSA data weekly
+MAX_WORKERS = 8  # threads used to parse the files inside each zip
+MAX_CACHED_SLICES = 128  # per-helper cap on cached year/sex/state slices
+
+def refresh_key():
+    # Passed to the disk-persisted loaders, which ignore ttl; a new value each
+    # CACHE_TTL period makes them download and parse the SSA zips again
+    return int(time.time() // CACHE_TTL)
+
+def fetch_zip(url):
+    buffer = BytesIO()
+    with requests.get(url, stream=True) as response:
+        # Raise on error pages so they are never parsed or persisted as zip data
+        response.raise_for_status()
+        for chunk in response.iter_content(chunk_size=1 << 16):
+            buffer.write(chunk)
+    return buffer.getvalue()
+
+@st.cache_data(persist="disk", show_spinner="Loading SSA names...")
+def load_national_data(week):
     names_file = 'https://www.ssa.gov/oact/babynames/names.zip'
-    response = requests.get(names_file)
-    with zipfile.ZipFile(BytesIO(response.content)) as z:
-        dfs = []
-        files = [file for file in z.namelist() if file.endswith('.txt')]
-        for file in files:
+    with zipfile.ZipFile(BytesIO(fetch_zip(names_file))) as z:
+        def parse(file):
             with z.open(file) as f:
-                df = pd.read_csv(f, header=None)
-                df.columns = ['name', 'sex', 'count']
-                df['year'] = int(file[3:7])
-                dfs.append(df)
+                df = pd.read_csv(
+                    f,
+                    header=None,
+                    names=['name', 'sex', 'count'],
+                    dtype={'name': 'string[pyarrow]', 'sex': 'category', 'count': 'int32'},
+                    engine='pyarrow'
+                )
+            df['year'] = np.int16(file[3:7])
+            return df
+
+        files = [file for file in z.namelist() if file.endswith('.txt')]
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            dfs = list(executor.map(parse, files))
         data = pd.concat(dfs, ignore_index=True)
-    return data
+    # pd.concat falls back to object when per-file categories differ
+    data = data.astype({
+        'sex': 'category',
+        'count': 'int32',
+        'year': 'int16'
+    })
+    data['name_length'] = data['name'].str.len().astype('int8')
+    # Sorted by year so .loc[year:year] is a binary search; pandas builds the
+    # lookup state lazily, so this pays off on the shared copy, not a fresh unpickle
+    data = data.sort_values(['year', 'sex']).set_index(['year', 'sex'])
+    name_lower = pd.Categorical(data['name'].str.lower())
+    name_index = data.groupby(name_lower, observed=True).indices
+    return data, name_index
 
-@st.cache_data
-def load_state_data():
+@st.cache_data(persist="disk", show_spinner="Loading SSA names...")
+def load_state_data(week):
     names_file = 'https://www.ssa.gov/oact/babynames/state/namesbystate.zip'
-    response = requests.get(names_file)
-    with zipfile.ZipFile(BytesIO(response.content)) as z:
-        dfs = []
-        for file in z.namelist():
-            if file.endswith('.TXT'):
-                with z.open(file) as f:
-                    df = pd.read_csv(f, header=None)
-                    df.columns = ['state', 'sex', 'year', 'name', 'count']
-                    dfs.append(df)
+    with zipfile.ZipFile(BytesIO(fetch_zip(names_file))) as z:
+        def parse(file):
+            with z.open(file) as f:
+                return pd.read_csv(
+                    f,
+                    header=None,
+                    names=['state', 'sex', 'year', 'name', 'count'],
+                    dtype={
+                        'state': 'category',
+                        'sex': 'category',
+                        'year': 'int16',
+                        'name': 'string[pyarrow]',
+                        'count': 'int32'
+                    },
+                    engine='pyarrow'
+                )
+
+        files = [file for file in z.namelist() if file.endswith('.TXT')]
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            dfs = list(executor.map(parse, files))
         data = pd.concat(dfs, ignore_index=True)
-    return data
+    # pd.concat falls back to object when per-file categories differ
+    data = data.astype({
+        'state': 'category',
+        'sex': 'category',
+        'count': 'int32',
+        'year': 'int16'
+    })
+    # Sorted by year so .loc[year:year] is a binary search; pandas builds the
+    # lookup state lazily, so this pays off on the shared copy, not a fresh unpickle
+    data = data.sort_values(['year', 'sex', 'state']).set_index(['year', 'sex', 'state'])
+    name_lower = pd.Categorical(data['name'].str.lower())
+    name_index = data.groupby(name_lower, observed=True).indices
+    return data, name_index
+
+# st.cache_data unpickles a fresh copy on every call, so keep one shared
+# in-memory copy of each dataset (and its name index) per week; callers
+# must only read from it
+@st.cache_resource(max_entries=1, show_spinner=False)
+def shared_national_data(week):
+    return load_national_data(week)
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def shared_state_data(week):
+    return load_state_data(week)
+
+@st.cache_data(ttl=CACHE_TTL)
+def state_codes():
+    state_data, _ = shared_state_data(refresh_key())
+    return sorted(state_data.index.unique(level='state'))
+
+@st.cache_data(ttl=CACHE_TTL)
+def national_year_range():
+    national_data, _ = shared_national_data(refresh_key())
+    years = national_data.index.levels[0]
+    return int(years.min()), int(years.max())
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=MAX_CACHED_SLICES)
+def top_names_national(year, sex, k=10):
+    national_data, _ = shared_national_data(refresh_key())
+    # Slice the year level alone; a missing year then gives an empty frame
+    year_data = national_data.loc[year:year]
+    year_data = year_data[year_data.index.get_level_values('sex') == sex]
+    return year_data.nlargest(k, 'count')[['name', 'count']].reset_index(drop=True)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=MAX_CACHED_SLICES)
+def top_names_state(year, sex, states, k=10):
+    state_data, _ = shared_state_data(refresh_key())
+    # Slice the year level alone; state data has no years before 1910
+    year_data = state_data.loc[year:year]
+    year_data = year_data[
+        (year_data.index.get_level_values('sex') == sex) &
+        (year_data.index.get_level_values('state').isin(states))
+    ]
+    return year_data.nlargest(k, 'count')[['name', 'count']].reset_index(drop=True)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=MAX_CACHED_SLICES)
+def name_lengths(year):
+    national_data, _ = shared_national_data(refresh_key())
+    return national_data.loc[year:year].reset_index()[['name', 'sex', 'name_length']]
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=64)
+def name_trend_data(name, data_scope, year_range, genders, states):
+    if data_scope == "National":
+        national_data, national_name_index = shared_national_data(refresh_key())
+        name_rows = national_name_index.get(name.lower(), [])
+        name_data = national_data.iloc[name_rows].reset_index()
+        name_data = name_data[name_data['year'].between(*year_range)]
+        columns = ['year', 'sex', 'count']
+    else:  # State
+        state_data, state_name_index = shared_state_data(refresh_key())
+        name_rows = state_name_index.get(name.lower(), [])
+        name_data = state_data.iloc[name_rows].reset_index()
+        name_data = name_data[
+            (name_data['state'].isin(states)) &
+            (name_data['year'].between(*year_range))
+        ]
+        columns = ['year', 'sex', 'state', 'count']
+    
+    # Keep only what the chart and Name Statistics use
+    return name_data.loc[name_data['sex'].isin(genders), columns]
 
-# Load data with a loading spinner
-with st.spinner('Loading names data...'):
-    national_data = load_national_data()
-    state_data = load_state_data()
+@st.cache_data(ttl=CACHE_TTL, max_entries=64)
+def name_trend_fig(name, data_scope, year_range, genders, states):
+    name_data = name_trend_data(name, data_scope, year_range, genders, states)
+    if data_scope == "National":
+        fig = px.line(
+            name_data,
+            x='year',
+            y='count',
+            color='sex',
+            title=f'Popularity of "{name}" Over Time'
+        )
+    else:
+        fig = px.line(
+            name_data,
+            x='year',
+            y='count',
+            color='state',
+            line_dash='sex',
+            render_mode='webgl',
+            title=f'Popularity of "{name}" by State'
+        )
+    return fig.to_dict()
 
 # Sidebar
 with st.sidebar:
@@ -53,10 +199,11 @@ with st.sidebar:
         ["National", "State"]
     )
     
+    selected_states = []
     if data_scope == "State":
         selected_states = st.multiselect(
             "Select States",
-            options=sorted(state_data['state'].unique()),
+            options=state_codes(),
             default=[]
         )
         
@@ -82,144 +229,111 @@ with st.sidebar:
 st.title('Baby Names Explorer')
 st.caption(f"Currently viewing: {data_scope} data")
 
-# Tabs
-tab1, tab2 = st.tabs(["Analysis", "Fun Facts & Stats"])
-
-with tab1:
-    if analysis_type == "Name Trends":
-        col1, col2 = st.columns([2, 1])
+# Each section is a fragment so its own widgets rerun only that section
+@st.fragment
+def name_trends(data_scope, gender_filter, selected_states):
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        input_name = st.text_input('Enter a name:', value="John")
+        year_range = st.slider(
+            "Year range",
+            min_value=1880,
+            max_value=2022,
+            value=(1950, 2022)
+        )
         
-        with col1:
-            input_name = st.text_input('Enter a name:', value="John")
-            year_range = st.slider(
-                "Year range",
-                min_value=1880,
-                max_value=2022,
-                value=(1950, 2022)
-            )
+        if input_name: # National
+            name_data = name_trend_data(input_name, data_scope, year_range, gender_filter, selected_states)
+            
+            if not name_data.empty:
+                fig = go.Figure(name_trend_fig(input_name, data_scope, year_range, gender_filter, selected_states))
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.warning("No data found for this name in the selected region(s)")
+    
+    with col2:
+        if not name_data.empty:
+            st.subheader("Name Statistics")
             
-            if input_name: # National
+            if data_scope == "National":
+                peak_data = name_data.loc[name_data['count'].idxmax()]
+                st.metric(
+                    "Peak Year",
+                    int(peak_data['year']),
+                    f"{peak_data['count']:,} babies"
+                )
+                
+                total_babies = name_data['count'].sum()
+                st.metric("Total Babies", f"{total_babies:,}")
+                
+                recent_year = name_data['year'].max()
+                recent_count = name_data[name_data['year'] == recent_year]['count'].sum()
+                st.metric("Most Recent Count", f"{recent_count:,}")
+            else:
+                state_sums = name_data.groupby('state', observed=True)['count'].sum()
+                top_state = state_sums.idxmax()
+                top_count = state_sums.max()
+                st.metric(
+                    "Most Popular in",
+                    top_state,
+                    f"{top_count:,} babies"
+                )
+
+@st.fragment
+def top_names(data_scope, gender_filter, selected_states):
+    year_select = st.slider(
+        "Select Year",
+        min_value=1880,
+        max_value=2022,
+        value=2000
+    )
+    
+    if len(gender_filter) > 0:
+        cols = st.columns(len(gender_filter))
+        
+        for sex, col in zip(gender_filter, cols):
+            with col:
                 if data_scope == "National":
-                    name_data = national_data[
-                        (national_data['name'].str.lower() == input_name.lower()) &
-                        (national_data['year'].between(*year_range))
-                    ]
+                    sex_data = top_names_national(year_select, sex)
                 else:  # State
-                    name_data = state_data[
-                        (state_data['name'].str.lower() == input_name.lower()) &
-                        (state_data['state'].isin(selected_states)) &
-                        (state_data['year'].between(*year_range))
-                    ]
+                    sex_data = top_names_state(year_select, sex, selected_states)
                 
-                name_data = name_data[name_data['sex'].isin(gender_filter)]
+                color_scale = 'Teal' if sex == 'M' else 'Peach'
                 
-                if not name_data.empty:
-                    if data_scope == "National":
-                        fig = px.line(
-                            name_data,
-                            x='year',
-                            y='count',
-                            color='sex',
-                            title=f'Popularity of "{input_name}" Over Time'
-                        )
-                    else:
-                        fig = px.line(
-                            name_data,
-                            x='year',
-                            y='count',
-                            color='state',
-                            line_dash='sex',
-                            title=f'Popularity of "{input_name}" by State'
-                        )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.warning("No data found for this name in the selected region(s)")
-        
-        with col2:
-            if not name_data.empty:
-                st.subheader("Name Statistics")
+                fig = px.bar(
+                    sex_data,
+                    x='name',
+                    y='count',
+                    title=f'Top {sex} Names in {year_select}',
+                    color='count',
+                    color_continuous_scale=color_scale
+                )
                 
-                if data_scope == "National":
-                    peak_data = name_data.loc[name_data['count'].idxmax()]
-                    st.metric(
-                        "Peak Year",
-                        int(peak_data['year']),
-                        f"{peak_data['count']:,} babies"
-                    )
-                    
-                    total_babies = name_data['count'].sum()
-                    st.metric("Total Babies", f"{total_babies:,}")
-                    
-                    recent_year = name_data['year'].max()
-                    recent_count = name_data[name_data['year'] == recent_year]['count'].sum()
-                    st.metric("Most Recent Count", f"{recent_count:,}")
-                else:
-                    top_state = name_data.groupby('state')['count'].sum().idxmax()
-                    st.metric(
-                        "Most Popular in",
-                        top_state,
-                        f"{name_data[name_data['state'] == top_state]['count'].sum():,} babies"
-                    )
-    
-    elif analysis_type == "Top Names":
-        year_select = st.slider(
-            "Select Year",
-            min_value=1880,
-            max_value=2022,
-            value=2000
-        )
-        
-        if data_scope == "National":
-            top_data = national_data[national_data['year'] == year_select]
-        else:  # State
-            top_data = state_data[
-                (state_data['year'] == year_select) &
-                (state_data['state'].isin(selected_states))
-            ]
-        
-        if len(gender_filter) > 0:
-            cols = st.columns(len(gender_filter))
-            
-            for sex, col in zip(gender_filter, cols):
-                with col:
-                    sex_data = top_data[top_data['sex'] == sex].nlargest(10, 'count')
-                    
-                    color_scale = 'Teal' if sex == 'M' else 'Peach'
-                    
-                    fig = px.bar(
-                        sex_data,
-                        x='name',
-                        y='count',
-                        title=f'Top {sex} Names in {year_select}',
-                        color='count',
-                        color_continuous_scale=color_scale
-                    )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.warning("Please select at least one gender to display the top names.")
+                st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.warning("Please select at least one gender to display the top names.")
 
-with tab2:
+@st.fragment
+def name_length_facts():
     col1, col2 = st.columns(2)
     
     with col1:
+        min_year, max_year = national_year_range()
         selected_year = st.slider(
             "Select Year to Analyze",
-            min_value=int(national_data['year'].min()),
-            max_value=int(national_data['year'].max()),
+            min_value=min_year,
+            max_value=max_year,
             value=2000
         )
     
-        year_data = national_data[national_data['year'] == selected_year].copy()
+        year_data = name_lengths(selected_year)
         
         st.info(
             "Tip: Click on the legend (e.g., 'M' or 'F' in the top-right corner) to hide or show data for specific genders."
         )
         
         if not year_data.empty:
-            year_data['name_length'] = year_data['name'].str.len()
-            
             fig = px.histogram(
                 year_data,
                 x='name_length',
@@ -234,7 +348,7 @@ with tab2:
     with col2:
         if not year_data.empty:
     
-            avg_length = year_data.groupby('sex')['name_length'].mean().round(2)
+            avg_length = year_data.groupby('sex', observed=True)['name_length'].mean().round(2)
             longest_names = year_data.nlargest(10, 'name_length')[['name', 'name_length', 'sex']].rename(
                 columns={
                     'name': 'Name',
@@ -253,6 +367,18 @@ with tab2:
         else:
             st.warning("Please select at least one gender to display statistics.")
 
+# Tabs
+tab1, tab2 = st.tabs(["Analysis", "Fun Facts & Stats"])
+
+with tab1:
+    if analysis_type == "Name Trends":
+        name_trends(data_scope, gender_filter, selected_states)
+    elif analysis_type == "Top Names":
+        top_names(data_scope, gender_filter, selected_states)
+
+with tab2:
+    name_length_facts()
+
 # Footer
 st.markdown("---")
 st.caption("Data source: U.S. Social Security Administration")
\ No newline at end of file
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 
 # Page configuration
 st.set_page_config(
@@ -9,19 +10,95 @@ st.set_page_config(
     layout="wide"
 )
 
+# Column types for the baseball CSV; the unnamed index column is skipped
+COLUMN_DTYPES = {
+    'Player Name': 'string',
+    'Age': 'int8',
+    'Team': 'category',
+    'At Bats': 'int16',
+    'Home Runs': 'int16',
+    'Home Runs per At Bat': 'float32',
+    'Slugging Percentage': 'float32',
+    'Batting Average': 'float32',
+    'Isolated Power': 'float32'
+}
+
 # Function to load data
-@st.cache_data
+@st.cache_data(persist="disk")
 def load_data():
     url = 'https://raw.githubusercontent.com/InjoongK/injoong-blog/refs/heads/main/_posts/baseball%20data.csv'
-    df = pd.read_csv(url)
+    df = pd.read_csv(url, usecols=list(COLUMN_DTYPES), dtype=COLUMN_DTYPES, engine='pyarrow')
     #df = pd.read_csv('C:/Users/rladl/Documents/another-stat386-theme/_posts/baseball data.csv')
-    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-    df = df[df['Team'] != '2TM']
+    df = df[df['Team'] != '2TM'].copy()
+    df['Team'] = df['Team'].cat.remove_unused_categories()
+    df['_name_lower'] = df['Player Name'].str.lower()
     return df
 
+# Function to rank players by each bar chart metric once
+@st.cache_resource
+def load_rankings():
+    df = load_data()
+    return {
+        metric: df.sort_values(metric, ascending=False, kind='stable').reset_index(drop=True)
+        for metric in ['Home Runs per At Bat', 'Isolated Power']
+    }
+
+# Function to aggregate every team metric at once
+@st.cache_data
+def load_team_stats():
+    df = load_data()
+    return df.groupby('Team', observed=True).agg({
+        'Home Runs per At Bat': 'mean',
+        'Isolated Power': 'mean',
+        'Home Runs': 'sum'
+    }).reset_index()
+
+# Function to search players by name
+@st.cache_data(max_entries=128)
+def search_players(query):
+    df = load_data()
+    matches = df['_name_lower'].str.contains(query.lower(), regex=False, na=False)
+    return df[matches].drop(columns='_name_lower').set_index('Player Name', drop=False)
+
+# Function to build a trendline scatter once per axis pair
+@st.cache_data(max_entries=64)
+def build_scatter_fig(x_axis, y_axis, title):
+    df = load_data()
+    fig = px.scatter(
+        df,
+        x=x_axis,
+        y=y_axis,
+        hover_data=['Player Name'],
+        trendline="ols",
+        render_mode='webgl',
+        title=title
+    )
+    return fig.to_dict()
+
+# Player search box that reruns on its own, without redrawing the rest of the page
+@st.fragment
+def player_search(key_suffix, search_label, select_label, info_message):
+    search_query = st.text_input(search_label, key=f"player_search_{key_suffix}", placeholder="Start typing a player's name...")
+
+    if search_query:
+        matched_players = search_players(search_query)
+
+        if not matched_players.empty:
+            player_name = st.selectbox(select_label, matched_players.index, key=f"player_select_{key_suffix}")
+
+            player_info = matched_players.loc[[player_name]]
+            if not player_info.empty:
+                with st.expander(f"Player Info: {player_name}"):
+                    st.write(player_info.reset_index(drop=True))
+        else:
+            st.warning("No players matched your search. Try another query.")
+    else:
+        st.info(info_message)
+
 # Load data
 try:
     df = load_data()
+    rankings = load_rankings()
 except:
     st.error("Please ensure your data file is in the correct location")
     st.stop()
@@ -59,7 +136,7 @@ if analysis_type == "Power Metrics Overview":
     with tab1:
         st.subheader(f"Top {top_n} Players by Home Runs per At Bat")
         hr_ab_fig = px.bar(
-            df.nlargest(top_n, 'Home Runs per At Bat'),
+            rankings['Home Runs per At Bat'].head(top_n),
             x='Player Name',
             y='Home Runs per At Bat',
             color='Home Runs per At Bat',
@@ -67,27 +144,12 @@ if analysis_type == "Power Metrics Overview":
         )
         st.plotly_chart(hr_ab_fig, use_container_width=True)
         
-        search_query_hr_ab = st.text_input("Search for a player:", key="player_search_hr_ab", placeholder="Start typing a player's name...")
-        
-        if search_query_hr_ab:
-            matched_players = df[df['Player Name'].str.contains(search_query_hr_ab, case=False, na=False)]
-
-            if not matched_players.empty:
-                player_name = st.selectbox("Select a specific player:", matched_players['Player Name'].tolist())
-
-                player_info = matched_players[matched_players['Player Name'] == player_name]
-                if not player_info.empty:
-                    with st.expander(f"Player Info: {player_name}"):
-                        st.write(player_info)
-            else:
-                st.warning("No players matched your search. Try another query.")
-        else:
-            st.info("Start typing to search for a specific player.")
+        player_search("hr_ab", "Search for a player:", "Select a specific player:", "Start typing to search for a specific player.")
     
     with tab2:
         st.subheader(f"Top {top_n} Players by Isolated Power")
         iso_fig = px.bar(
-            df.nlargest(top_n, 'Isolated Power'),
+            rankings['Isolated Power'].head(top_n),
             x='Player Name',
             y='Isolated Power',
             color='Isolated Power',
@@ -95,33 +157,11 @@ if analysis_type == "Power Metrics Overview":
         )
         st.plotly_chart(iso_fig, use_container_width=True)
         
-        search_query_iso = st.text_input("Search for a specific player:", key="player_search_iso", placeholder="Start typing a player's name...")
-
-        if search_query_iso:
-            matched_players = df[df['Player Name'].str.contains(search_query_iso, case=False, na=False)]
-
-            if not matched_players.empty:
-                player_name = st.selectbox("Select a player:", matched_players['Player Name'].tolist())
-
-                player_info = matched_players[matched_players['Player Name'] == player_name]
-                if not player_info.empty:
-                    with st.expander(f"Player Info: {player_name}"):
-                        st.write(player_info)
-            else:
-                st.warning("No players matched your search. Try another query.")
-        else:
-            st.info("Start typing to search for specific a player.")
+        player_search("iso", "Search for a specific player:", "Select a player:", "Start typing to search for specific a player.")
 
     with tab3:
         st.subheader("Correlation between HR/AB and ISO")
-        scatter_fig = px.scatter(
-            df,
-            x='Home Runs per At Bat',
-            y='Isolated Power',
-            hover_data=['Player Name'],
-            trendline="ols",
-            title="HR/AB vs ISO Correlation"
-        )
+        scatter_fig = go.Figure(build_scatter_fig('Home Runs per At Bat', 'Isolated Power', "HR/AB vs ISO Correlation"))
         st.plotly_chart(scatter_fig, use_container_width=True)
 
 
@@ -133,14 +173,12 @@ elif analysis_type == "Team Power Analysis":
         ["Average HR/AB", "Average ISO", "Total Home Runs"]
     )
     
+    team_stats = load_team_stats()
     if team_metric == "Average HR/AB":
-        team_stats = df.groupby('Team')['Home Runs per At Bat'].mean().reset_index()
         y_col = 'Home Runs per At Bat'
     elif team_metric == "Average ISO":
-        team_stats = df.groupby('Team')['Isolated Power'].mean().reset_index()
         y_col = 'Isolated Power'
     else:
-        team_stats = df.groupby('Team')['Home Runs'].sum().reset_index()
         y_col = 'Home Runs'
     
     team_fig = px.bar(
@@ -167,14 +205,7 @@ elif analysis_type == "Custom Analysis":
             index=1
         )
     
-    custom_fig = px.scatter(
-        df,
-        x=x_axis,
-        y=y_axis,
-        hover_data=['Player Name'],
-        trendline="ols",
-        title=f"{x_axis} vs {y_axis} Analysis"
-    )
+    custom_fig = go.Figure(build_scatter_fig(x_axis, y_axis, f"{x_axis} vs {y_axis} Analysis"))
     st.plotly_chart(custom_fig, use_container_width=True)
 
 st.markdown("""---""")